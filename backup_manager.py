@@ -1,8 +1,10 @@
 """Main backup orchestration logic."""
 import os
 import datetime
+import queue
 import shutil
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 from config import Config
 from telegram_logger import TelegramLogger
 from compressor import Compressor
@@ -15,7 +17,7 @@ class BackupManager:
     def __init__(self):
         """Initialize backup manager with dependencies."""
         self.logger = TelegramLogger()
-        self.uploader = NextcloudUploader(self.logger)
+        self.uploader = NextcloudUploader.instance(self.logger)
         self.compressor = Compressor()
     
     def get_backup_directories(self) -> List[str]:
@@ -25,37 +27,262 @@ class BackupManager:
         Returns:
             List of absolute directory paths to backup
         """
-        base_dir = Config.BACKUP_BASE_DIR
-        forbidden_file = Config.FORBIDDEN_DIRS_FILE
+        cfg = Config.get()
+        base_dir = cfg.BACKUP_BASE_DIR
+        forbidden_file = cfg.FORBIDDEN_DIRS_FILE
         
-        # Load blacklist
+        # Load blacklist (paths resolved against the cwd once, not per line)
         blacklist = set()
         if os.path.exists(forbidden_file):
             try:
+                cwd = os.getcwd()
                 with open(forbidden_file, "r") as f:
-                    blacklist = {
-                        os.path.abspath(line.strip())
-                        for line in f.readlines()
-                        if line.strip()
-                    }
+                    for line in f:
+                        path = line.strip()
+                        if path:
+                            blacklist.add(os.path.normpath(os.path.join(cwd, path)))
             except Exception as e:
                 self.logger.send_error(f"Failed to read forbidden file: {e}")
         
         # Get all directories
         directories = []
         try:
-            for item in os.listdir(base_dir):
-                full_path = os.path.abspath(os.path.join(base_dir, item))
-                if os.path.isdir(full_path) and full_path not in blacklist:
+            abs_base_dir = os.path.abspath(base_dir)
+            for item in os.listdir(abs_base_dir):
+                full_path = os.path.join(abs_base_dir, item)
+                if full_path not in blacklist and os.path.isdir(full_path):
                     directories.append(full_path)
         except Exception as e:
             self.logger.send_error(f"Failed to list directories: {e}")
         
         return sorted(directories)
     
+    def backup_directory(
+        self,
+        directory: str,
+        work_dir: str,
+        remote_path: str,
+        store_only: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
+    ) -> Tuple[int, int]:
+        """
+        Compress a directory and upload its volumes as they are produced.
+        
+        Compression runs in a background thread and hands each finished
+        volume to the uploader through a bounded queue, so uploads overlap
+        with compression. Every part is deleted as soon as its upload ends.
+        If compression or any part's upload fails, the parts already
+        uploaded are deleted from Nextcloud too, since a partial archive
+        cannot be restored (failed parts are gone locally and cannot be
+        re-sent).
+        
+        Args:
+            directory: Directory to back up
+            work_dir: Local directory for temporary archive volumes
+            remote_path: Remote directory path in Nextcloud
+            store_only: Archive without compressing (already-compressed content)
+            on_warning: Called (from the compression thread) with each
+                        warning of an archiver that still completed
+            
+        Returns:
+            Tuple of (successful_uploads, failed_uploads)
+            
+        Raises:
+            Exception: If compression fails
+        """
+        cfg = Config.get()
+        if cfg.STREAM_UPLOADS:
+            return self._stream_directory(
+                directory, remote_path, store_only, on_warning
+            )
+        
+        dir_name = os.path.basename(directory)
+        archive_name = self.compressor.archive_name(directory, cfg.ARCHIVE_FORMAT)
+        parts: "queue.Queue[str | None]" = queue.Queue(
+            maxsize=cfg.MAX_UPLOAD_WORKERS * 2
+        )
+        part_sizes = []
+        
+        def on_volume(path: str) -> None:
+            part_sizes.append(os.path.getsize(path))
+            parts.put(path)
+        
+        def compress() -> List[str]:
+            try:
+                return self.compressor.compress_directory(
+                    directory,
+                    work_dir,
+                    max_size=cfg.MAX_VOLUME_SIZE,
+                    compression_preset=cfg.COMPRESSION_PRESET,
+                    use_multiprocessing=cfg.USE_MULTIPROCESSING,
+                    on_volume=on_volume,
+                    archive_format=cfg.ARCHIVE_FORMAT,
+                    store_only=store_only,
+                    on_warning=on_warning
+                )
+            finally:
+                parts.put(None)  # Sentinel: no more volumes
+        
+        try:
+            with ThreadPoolExecutor(max_workers=1) as compression_pool:
+                compression = compression_pool.submit(compress)
+                successful, failed = self.uploader.upload_files_parallel(
+                    iter(parts.get, None), remote_path, dir_name,
+                    delete_after=True
+                )
+                archive_parts = compression.result()
+        except Exception:
+            self._discard_archive(remote_path, archive_name)
+            raise
+        
+        if failed:
+            self._discard_archive(remote_path, archive_name)
+        
+        # Log compression results with file sizes
+        size_str = self.compressor.format_size(sum(part_sizes))
+        self.logger.send_batched(
+            f"✅ Compressed into {len(archive_parts)} part(s) ({size_str} total)"
+        )
+        
+        return successful, failed
+    
+    def _stream_directory(
+        self,
+        directory: str,
+        remote_path: str,
+        store_only: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
+    ) -> Tuple[int, int]:
+        """
+        Compress a directory and upload it without touching the local disk.
+        
+        If compression or an upload fails, the volumes already uploaded
+        are deleted from Nextcloud.
+        
+        Returns:
+            Tuple of (successful_uploads, failed_uploads)
+            
+        Raises:
+            Exception: If compression or any upload fails
+        """
+        cfg = Config.get()
+        archive_name = self.compressor.archive_name(directory, "zst")
+        try:
+            with self.compressor.stream_directory(
+                directory,
+                compression_preset=cfg.COMPRESSION_PRESET,
+                use_multiprocessing=cfg.USE_MULTIPROCESSING,
+                store_only=store_only,
+                on_warning=on_warning
+            ) as stream:
+                part_sizes = self.uploader.upload_stream(
+                    stream, remote_path, archive_name, cfg.MAX_VOLUME_SIZE
+                )
+        except Exception:
+            self._discard_archive(remote_path, archive_name)
+            raise
+        
+        size_str = self.compressor.format_size(sum(part_sizes))
+        self.logger.send_batched(
+            f"✅ Compressed into {len(part_sizes)} part(s) ({size_str} total)"
+        )
+        
+        return len(part_sizes), 0
+    
+    def _discard_archive(self, remote_path: str, archive_name: str) -> None:
+        """Delete the uploaded parts of an incomplete archive from Nextcloud."""
+        deleted = self.uploader.delete_archive(remote_path, archive_name)
+        if deleted:
+            self.logger.send_batched(
+                f"🗑️ Removed {deleted} uploaded part(s) of incomplete {archive_name}"
+            )
+    
+    def _backup_one(
+        self,
+        idx: int,
+        total_dirs: int,
+        directory: str,
+        work_dir: str,
+        remote_path: str
+    ) -> Tuple[int, int]:
+        """
+        Back up one directory and report its outcome to Telegram.
+        
+        Safe to run for several directories at once: volumes go to a
+        per-directory subdirectory of work_dir, and batched log lines are
+        kept per thread.
+        
+        Returns:
+            Tuple of (successful_uploads, failed_uploads); a directory that
+            fails outright counts as one failure
+        """
+        cfg = Config.get()
+        dir_name = os.path.basename(directory)
+        
+        # Calculate and log directory size
+        dir_size, compressed_size = self.compressor.get_directory_stats(directory)
+        size_str = self.compressor.format_size(dir_size)
+        
+        # Mostly media/archives: recompressing burns CPU for no gain
+        store_only = (
+            dir_size > 0
+            and compressed_size / dir_size >= cfg.STORE_COMPRESSED_RATIO
+        )
+        action = "Storing" if store_only else "Compressing"
+        
+        # Progress lines are batched into one message per directory
+        self.logger.send_batched(
+            f"📦 [{idx}/{total_dirs}] {action}: {dir_name} ({size_str})"
+        )
+        
+        dir_work_dir = os.path.join(work_dir, dir_name)
+        os.makedirs(dir_work_dir, exist_ok=True)
+        # Collected rather than logged directly: the archiver reports them
+        # from the compression thread, which has its own batch
+        warnings = []
+        try:
+            successful, failed = self.backup_directory(
+                directory, dir_work_dir, remote_path, store_only,
+                warnings.append
+            )
+            
+            if failed == 0:
+                self.logger.send_batched(
+                    f"✅ Completed {dir_name}: {successful} part(s) uploaded"
+                )
+                self.logger.flush()
+            else:
+                self.logger.flush()
+                self.logger.send_error(
+                    f"Completed {dir_name} with errors: "
+                    f"{successful} succeeded, {failed} failed"
+                )
+            # The archive is kept, but some files may be missing or
+            # inconsistent in it
+            for warning in warnings:
+                self.logger.send_error(
+                    f"Archived {dir_name} with warnings: {warning}"
+                )
+            return successful, failed
+            
+        except Exception as e:
+            self.logger.flush()
+            self.logger.send_error(f"Failed to backup {dir_name}: {e}")
+            return 0, 1
+        
+        finally:
+            # Uploaded volumes are already deleted; anything left behind
+            # is removed with the whole work dir at the end of the run
+            try:
+                os.rmdir(dir_work_dir)
+            except OSError:
+                pass
+    
     def run_backup(self) -> None:
         """Execute the complete backup process."""
+        cfg = Config.get()
         self.logger.send("🚀 Starting backup process...")
+        self.uploader.forget_remote_dirs()
         
         # Create timestamp for this backup session
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -75,67 +302,20 @@ class BackupManager:
                 f"📂 Found {total_dirs} director{'y' if total_dirs == 1 else 'ies'} for backup"
             )
             
-            # Process each directory
-            total_successful = 0
-            total_failed = 0
-            
-            for idx, directory in enumerate(directories, start=1):
-                dir_name = os.path.basename(directory)
-                
-                # Calculate and log directory size
-                dir_size = self.compressor.get_directory_size(directory)
-                size_str = self.compressor.format_size(dir_size)
-                
-                self.logger.send(
-                    f"📦 [{idx}/{total_dirs}] Compressing: {dir_name} ({size_str})"
-                )
-                
-                try:
-                    # Compress directory with configured settings
-                    archive_parts = self.compressor.compress_directory(
-                        directory,
-                        work_dir,
-                        max_size=Config.MAX_VOLUME_SIZE,
-                        compression_preset=Config.COMPRESSION_PRESET,
-                        use_multiprocessing=Config.USE_MULTIPROCESSING
+            # Back up up to MAX_PARALLEL_DIRS directories at once, each in
+            # its own work subdirectory
+            remote_path = f"{cfg.NEXTCLOUD_BACKUP_PATH}/{timestamp}"
+            with ThreadPoolExecutor(max_workers=cfg.MAX_PARALLEL_DIRS) as pool:
+                futures = [
+                    pool.submit(
+                        self._backup_one,
+                        idx, total_dirs, directory, work_dir, remote_path
                     )
-                    
-                    # Log compression results with file sizes
-                    total_size = sum(os.path.getsize(f) for f in archive_parts)
-                    size_str = self.compressor.format_size(total_size)
-                    self.logger.send(
-                        f"✅ Compressed into {len(archive_parts)} part(s) ({size_str} total)"
-                    )
-                    
-                    # Upload parts
-                    remote_path = f"{Config.NEXTCLOUD_BACKUP_PATH}/{timestamp}"
-                    successful, failed = self.uploader.upload_files_parallel(
-                        archive_parts, remote_path, dir_name
-                    )
-                    
-                    total_successful += successful
-                    total_failed += failed
-                    
-                    if failed == 0:
-                        self.logger.send_success(
-                            f"Completed {dir_name}: {successful} part(s) uploaded"
-                        )
-                    else:
-                        self.logger.send_error(
-                            f"Completed {dir_name} with errors: "
-                            f"{successful} succeeded, {failed} failed"
-                        )
-                    
-                except Exception as e:
-                    self.logger.send_error(f"Failed to backup {dir_name}: {e}")
-                    total_failed += 1
-                
-                # Clean up work directory after each backup to save disk space
-                try:
-                    shutil.rmtree(work_dir, ignore_errors=True)
-                    os.makedirs(work_dir, exist_ok=True)
-                except Exception as e:
-                    self.logger.send_error(f"Failed to clean work directory: {e}")
+                    for idx, directory in enumerate(directories, start=1)
+                ]
+                results = [future.result() for future in futures]
+            total_successful = sum(successful for successful, _ in results)
+            total_failed = sum(failed for _, failed in results)
             
             # Final summary
             self.logger.send(
@@ -147,6 +327,8 @@ class BackupManager:
             self.logger.send_error(f"Backup process error: {e}")
         
         finally:
+            self.logger.flush()
+            
             # Final cleanup
             try:
                 shutil.rmtree(work_dir, ignore_errors=True)
@@ -1,13 +1,152 @@
 """Directory compression functionality."""
+import contextlib
+import glob
+import io
 import os
-from typing import List
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
 import multivolumefile
 import py7zr
 from config import Config
 
 
+# Directory scans block in the kernel, so more threads than cores pay off
+SIZE_SCAN_WORKERS = 16
+
+# Buffer between py7zr and the volume splitter
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+# Exit codes that mean the archive was written but something was skipped:
+# GNU tar returns 1 when a file changed while it was read, 7-Zip returns 1
+# for non-fatal errors such as a file it could not open
+WARNING_EXIT_CODES = {"tar": 1, "7z": 1, "7zz": 1, "7za": 1}
+
+# Formats whose content is already compressed; recompressing gains ~nothing
+COMPRESSED_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic",
+    ".mp4", ".mov", ".mkv", ".avi", ".webm",
+    ".mp3", ".flac", ".ogg", ".m4a", ".aac",
+    ".zip", ".7z", ".gz", ".xz", ".bz2", ".zst", ".rar",
+    ".pdf", ".docx", ".xlsx", ".pptx", ".odt", ".ods",
+})
+
+
+def _volume_index(path: str) -> int:
+    """Return the numeric extension of a volume path (name.7z.0001 -> 1)."""
+    return int(path.rsplit(".", 1)[1])
+
+
+def _exit_status(command: List[str], returncode: int, stderr: str) -> Optional[str]:
+    """
+    Classify a finished command's exit code.
+    
+    Returns:
+        None on success, or the command's stderr (or a generic note) if it
+        exited with its warning code
+        
+    Raises:
+        RuntimeError: If the command failed
+    """
+    if returncode == 0:
+        return None
+    program = os.path.basename(command[0])
+    if WARNING_EXIT_CODES.get(program) == returncode:
+        return stderr.strip() or f"{program} exited with warnings"
+    raise RuntimeError(
+        f"{program} failed with exit code {returncode}: {stderr.strip()}"
+    )
+
+
+def _list_volumes(output_path: str, archive_name: str) -> List[str]:
+    """
+    List the volumes of one archive in order, ignoring any other files.
+    
+    Args:
+        output_path: Directory holding the volumes
+        archive_name: Archive file name without the volume extension
+        
+    Returns:
+        Sorted list of volume paths (name.7z.001, name.tar.zst.0001, ...)
+    """
+    pattern = os.path.join(
+        glob.escape(output_path), glob.escape(archive_name) + ".[0-9][0-9][0-9]*"
+    )
+    return sorted(
+        (path for path in glob.glob(pattern) if path.rsplit(".", 1)[1].isdigit()),
+        key=_volume_index
+    )
+
+
+class _VolumeWriter(multivolumefile.MultiVolume):
+    """
+    MultiVolume writer usable under io.BufferedWriter that can report each
+    volume as soon as it is complete.
+    """
+    
+    def __init__(self, *args, on_volume: Optional[Callable[[str], None]] = None, **kwargs):
+        self._on_volume = on_volume
+        super().__init__(*args, **kwargs)
+    
+    def write(self, b) -> int:
+        # io.BufferedWriter expects the raw write to return the bytes taken
+        super().write(b)
+        return len(b)
+    
+    def _add_volume(self):
+        previous = self._files[-1]
+        previous.flush()
+        super()._add_volume()
+        # The first volume is rewritten with the 7z start header when the
+        # archive is closed, so it can only be reported after close().
+        if self._on_volume is not None and len(self._files) > 2:
+            self._on_volume(str(self._fileinfo[-2].filename))
+
+
+class _VolumeWatcher(threading.Thread):
+    """Poll an output directory and report volumes written by an external archiver."""
+    
+    def __init__(
+        self,
+        output_path: str,
+        archive_name: str,
+        on_volume: Callable[[str], None],
+        interval: float = 1.0,
+        hold_first: bool = True
+    ):
+        super().__init__(daemon=True)
+        self.output_path = output_path
+        self.archive_name = archive_name
+        self.on_volume = on_volume
+        self.interval = interval
+        self.hold_first = hold_first
+        self._seen = set()
+        self._stopped = threading.Event()
+    
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            volumes = _list_volumes(self.output_path, self.archive_name)
+            # A volume is complete once the next one has been created. A 7z
+            # archive's first volume is rewritten with the start header on close.
+            start = 1 if self.hold_first else 0
+            for path in volumes[start:-1]:
+                if path not in self._seen:
+                    self._seen.add(path)
+                    self.on_volume(path)
+    
+    def stop(self) -> None:
+        """Stop polling and wait for the current poll to finish."""
+        self._stopped.set()
+        self.join()
+
+
 class Compressor:
-    """Handle directory compression into multi-volume 7z archives."""
+    """Handle directory compression into multi-volume 7z or tar.zst archives."""
     
     @staticmethod
     def compress_directory(
@@ -15,10 +154,18 @@ class Compressor:
         output_path: str,
         max_size: int = None,
         compression_preset: int = 1,
-        use_multiprocessing: bool = True
+        use_multiprocessing: bool = True,
+        on_volume: Optional[Callable[[str], None]] = None,
+        archive_format: str = None,
+        store_only: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
     ) -> List[str]:
         """
-        Compress a directory into multi-volume .7z files.
+        Compress a directory into multi-volume .7z or .tar.zst files.
+        
+        For the 7z format the native 7-Zip binary (7zz or 7z) is used when it
+        is installed, with py7zr as a fallback. The zst format pipes tar into
+        zstd and splits the stream into volumes.
         
         Args:
             directory_path: Path to directory to compress
@@ -27,59 +174,423 @@ class Compressor:
             compression_preset: LZMA2 compression level 0-9 (default: 1 for fast)
                                0 = fastest, 1 = very fast, 5 = balanced, 7 = default, 9 = max
             use_multiprocessing: Enable multi-core compression (default: True)
+            on_volume: Optional callback invoked with the path of each volume
+                       as soon as it is fully written, so it can be uploaded
+                       while compression continues. Every volume is reported
+                       exactly once; the first and last ones after close.
+            archive_format: "7z" or "zst" (default from config)
+            store_only: Skip compression (7z Copy method, fastest zstd level),
+                        for content that is already compressed
+            on_warning: Optional callback invoked with the message of an
+                        external tool that finished with warnings (e.g. a
+                        file changed while tar read it); the archive is
+                        kept. Without it such warnings are ignored.
             
         Returns:
             List of paths to generated archive files
             
         Raises:
             ValueError: If directory_path is not a valid directory
+            RuntimeError: If an external compression tool fails or is missing
         """
         if not os.path.isdir(directory_path):
             raise ValueError(f"Path '{directory_path}' is not a valid directory")
         
         if max_size is None:
-            max_size = Config.MAX_VOLUME_SIZE
+            max_size = Config.get().MAX_VOLUME_SIZE
+        
+        if archive_format is None:
+            archive_format = Config.get().ARCHIVE_FORMAT
         
         os.makedirs(output_path, exist_ok=True)
         
-        dir_name = os.path.basename(directory_path)
-        archive_path = os.path.join(output_path, f"{dir_name}.7z")
+        archive_path = os.path.join(
+            output_path, Compressor.archive_name(directory_path, archive_format)
+        )
         
-        # Create multi-volume 7z archive with proper parameters
-        # ext_digits=4 creates files like: name.7z.0001, name.7z.0002, etc.
-        # Lower preset = faster compression, use multiprocessing for speed
-        filters = [{"id": py7zr.FILTER_LZMA2, "preset": compression_preset}]
+        reported = []
         
-        with multivolumefile.MultiVolume(
-            archive_path,
-            mode="wb",
-            volume=max_size,
-            ext_digits=4
-        ) as target:
-            with py7zr.SevenZipFile(
-                target,
-                mode='w',
-                filters=filters,
-                mp=use_multiprocessing
-            ) as archive:
-                archive.writeall(directory_path, arcname=dir_name)
+        def report(path: str) -> None:
+            reported.append(path)
+            on_volume(path)
         
-        # Return sorted list of generated files
-        archive_files = [
-            os.path.join(output_path, f)
-            for f in sorted(os.listdir(output_path))
-            if f.startswith(dir_name)
+        binary = Compressor.find_7z_binary()
+        try:
+            if archive_format == "zst":
+                Compressor._compress_zstd(
+                    directory_path,
+                    output_path,
+                    archive_path,
+                    max_size,
+                    compression_preset,
+                    use_multiprocessing,
+                    report if on_volume is not None else None,
+                    store_only,
+                    on_warning
+                )
+            elif binary:
+                Compressor._compress_native(
+                    binary,
+                    directory_path,
+                    output_path,
+                    archive_path,
+                    max_size,
+                    compression_preset,
+                    use_multiprocessing,
+                    report if on_volume is not None else None,
+                    store_only,
+                    on_warning
+                )
+            else:
+                Compressor._compress_py7zr(
+                    directory_path,
+                    archive_path,
+                    max_size,
+                    compression_preset,
+                    use_multiprocessing,
+                    report if on_volume is not None else None,
+                    store_only
+                )
+        except Exception:
+            # Drop the partial volumes nobody has taken ownership of yet
+            for file in _list_volumes(output_path, os.path.basename(archive_path)):
+                if file not in reported:
+                    try:
+                        os.unlink(file)
+                    except OSError:
+                        pass
+            raise
+        
+        # Volumes already reported may have been consumed (uploaded and
+        # deleted) by now, so only the remaining ones are listed and verified
+        remaining = [
+            f for f in _list_volumes(output_path, os.path.basename(archive_path))
+            if f not in reported
         ]
         
-        # Verify files were created
-        for file in archive_files:
-            if not os.path.exists(file):
+        # Verify files were created, with a single stat per file
+        for file in remaining:
+            try:
+                size = os.stat(file).st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Expected archive file not found: {file}")
-            size = os.path.getsize(file)
             if size == 0:
                 raise ValueError(f"Archive file is empty (0 bytes): {file}")
         
-        return archive_files
+        if on_volume is not None:
+            for file in remaining:
+                report(file)
+        
+        # Return sorted list of generated files
+        return sorted(set(reported) | set(remaining), key=_volume_index)
+    
+    @staticmethod
+    def archive_name(directory_path: str, archive_format: str = None) -> str:
+        """
+        Return the archive file name for a directory, without the volume
+        extension (name.7z or name.tar.zst).
+        """
+        if archive_format is None:
+            archive_format = Config.get().ARCHIVE_FORMAT
+        extension = "tar.zst" if archive_format == "zst" else "7z"
+        return f"{os.path.basename(directory_path)}.{extension}"
+    
+    @staticmethod
+    def find_7z_binary() -> Optional[str]:
+        """Return the path of the native 7-Zip binary, or None if not installed."""
+        return shutil.which("7zz") or shutil.which("7z")
+    
+    @staticmethod
+    def _compress_native(
+        binary: str,
+        directory_path: str,
+        output_path: str,
+        archive_path: str,
+        max_size: int,
+        compression_preset: int,
+        use_multiprocessing: bool,
+        on_volume: Optional[Callable[[str], None]],
+        store_only: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
+    ) -> None:
+        """
+        Compress with the native 7-Zip binary (multi-threaded LZMA2).
+        
+        Volumes are named like: name.7z.001, name.7z.002, etc. Warnings
+        (exit code 1) are passed to on_warning instead of failing.
+        
+        Raises:
+            RuntimeError: If 7-Zip exits with an error
+        """
+        if store_only:
+            methods = ["-m0=Copy"]
+        else:
+            methods = ["-m0=lzma2", f"-mx={compression_preset}"]
+        command = [
+            binary, "a", "-t7z", *methods,
+            f"-mmt={'on' if use_multiprocessing else 'off'}",
+            f"-v{max_size}b",
+            "-bd", "-y",
+            archive_path,
+            directory_path,
+        ]
+        
+        watcher = None
+        if on_volume is not None:
+            watcher = _VolumeWatcher(
+                output_path, os.path.basename(archive_path), on_volume
+            )
+            watcher.start()
+        
+        try:
+            result = subprocess.run(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        finally:
+            if watcher is not None:
+                watcher.stop()
+        
+        warning = _exit_status(command, result.returncode, result.stderr)
+        if warning is not None and on_warning is not None:
+            on_warning(warning)
+    
+    @staticmethod
+    def _compress_zstd(
+        directory_path: str,
+        output_path: str,
+        archive_path: str,
+        max_size: int,
+        compression_preset: int,
+        use_multiprocessing: bool,
+        on_volume: Optional[Callable[[str], None]],
+        store_only: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
+    ) -> None:
+        """
+        Compress with tar | zstd --long=27 | split.
+        
+        The preset 0-9 is mapped to zstd levels 1-19. Volumes are named like:
+        name.tar.zst.0001, name.tar.zst.0002, etc. Restore with:
+        cat name.tar.zst.* | zstd -d --long=27 | tar -x
+        
+        Raises:
+            RuntimeError: If zstd is not installed or a pipeline stage fails
+        """
+        stages = Compressor._zstd_stages(
+            directory_path, compression_preset, use_multiprocessing, store_only
+        )
+        stages.append([
+            "split", "-b", str(max_size), "-d", "-a", "4",
+            "--numeric-suffixes=1", "-", f"{archive_path}.",
+        ])
+        
+        watcher = None
+        if on_volume is not None:
+            # Volumes are written strictly in order, the first is final too
+            watcher = _VolumeWatcher(
+                output_path, os.path.basename(archive_path), on_volume,
+                hold_first=False
+            )
+            watcher.start()
+        
+        try:
+            with Compressor._run_pipeline(stages, on_warning=on_warning):
+                pass
+        finally:
+            if watcher is not None:
+                watcher.stop()
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def stream_directory(
+        directory_path: str,
+        compression_preset: int = 1,
+        use_multiprocessing: bool = True,
+        store_only: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
+    ) -> Iterator[BinaryIO]:
+        """
+        Compress a directory with tar | zstd and expose the output as a stream.
+        
+        Nothing is written to disk; the caller reads the compressed tar.zst
+        bytes from the yielded pipe and decides how to split them.
+        
+        Args:
+            directory_path: Path to directory to compress
+            compression_preset: Compression level 0-9 (mapped to zstd 1-19)
+            use_multiprocessing: Enable multi-threaded zstd (default: True)
+            store_only: Use the fastest zstd level for already-compressed content
+            on_warning: Optional callback for tar warnings (see compress_directory)
+            
+        Yields:
+            Readable binary stream of the compressed archive
+            
+        Raises:
+            ValueError: If directory_path is not a valid directory
+            RuntimeError: If zstd is not installed or a pipeline stage fails
+        """
+        if not os.path.isdir(directory_path):
+            raise ValueError(f"Path '{directory_path}' is not a valid directory")
+        
+        stages = Compressor._zstd_stages(
+            directory_path, compression_preset, use_multiprocessing, store_only
+        )
+        with Compressor._run_pipeline(
+            stages, capture_output=True, on_warning=on_warning
+        ) as stream:
+            yield stream
+    
+    @staticmethod
+    def _zstd_stages(
+        directory_path: str,
+        compression_preset: int,
+        use_multiprocessing: bool,
+        store_only: bool = False
+    ) -> List[List[str]]:
+        """
+        Build the tar and zstd commands of a zst compression pipeline.
+        
+        Raises:
+            RuntimeError: If zstd is not installed
+        """
+        if not shutil.which("zstd"):
+            raise RuntimeError("ARCHIVE_FORMAT=zst requires the zstd binary")
+        
+        parent, name = os.path.split(os.path.abspath(directory_path))
+        return [
+            ["tar", "-cf", "-", "-C", parent, name],
+            [
+                "zstd", "-q", "-c", "--long=27",
+                f"-T{0 if use_multiprocessing else 1}",
+                # zstd has no store mode; level 1 passes incompressible
+                # blocks through raw at near disk speed
+                "-1" if store_only else f"-{compression_preset * 2 + 1}",
+            ],
+        ]
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def _run_pipeline(
+        stages: List[List[str]],
+        capture_output: bool = False,
+        on_warning: Optional[Callable[[str], None]] = None
+    ) -> Iterator[Optional[BinaryIO]]:
+        """
+        Run commands connected by pipes and wait for all of them on exit.
+        
+        A command exiting with its code from WARNING_EXIT_CODES still
+        produced complete output; its stderr is passed to on_warning.
+        
+        Yields:
+            The last command's stdout if capture_output is set, else None
+            
+        Raises:
+            RuntimeError: If any command fails, naming the last stage that
+                failed rather than the upstream ones it took down
+        """
+        # stderr goes to temp files so a chatty stage cannot fill a pipe
+        # and stall the whole pipeline
+        processes = []
+        errors = [tempfile.TemporaryFile(mode="w+") for _ in stages]
+        try:
+            stdin = None
+            for index, (command, stderr) in enumerate(zip(stages, errors)):
+                piped = capture_output or index < len(stages) - 1
+                process = subprocess.Popen(
+                    command,
+                    stdin=stdin,
+                    stdout=subprocess.PIPE if piped else subprocess.DEVNULL,
+                    stderr=stderr
+                )
+                if stdin is not None:
+                    stdin.close()  # Only the child should hold the read end
+                stdin = process.stdout
+                processes.append(process)
+            
+            yield stdin
+            
+            if stdin is not None:
+                stdin.close()
+            for process in processes:
+                process.wait()
+            
+            # When a stage dies, every stage before it is killed by SIGPIPE
+            # on its next write. Stages are checked from the last one back
+            # so the failure reported is the stage that failed on its own,
+            # and signal deaths upstream of a failure are ignored.
+            warnings = []
+            failure = None
+            for command, process, stderr in reversed(
+                list(zip(stages, processes, errors))
+            ):
+                if process.returncode == 0:
+                    continue
+                if process.returncode < 0 and failure is not None:
+                    continue
+                stderr.seek(0)
+                try:
+                    warning = _exit_status(
+                        command, process.returncode, stderr.read()
+                    )
+                except RuntimeError as e:
+                    failure = failure or e
+                    continue
+                if warning is not None:
+                    warnings.insert(0, warning)
+            if failure is not None:
+                raise failure
+            
+            # Report only once every stage is known to have succeeded
+            if on_warning is not None:
+                for warning in warnings:
+                    on_warning(warning)
+        finally:
+            for process in processes:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+            for stderr in errors:
+                stderr.close()
+    
+    @staticmethod
+    def _compress_py7zr(
+        directory_path: str,
+        archive_path: str,
+        max_size: int,
+        compression_preset: int,
+        use_multiprocessing: bool,
+        on_volume: Optional[Callable[[str], None]],
+        store_only: bool = False
+    ) -> None:
+        """
+        Compress with py7zr (fallback when no native 7-Zip is installed).
+        
+        Volumes are named like: name.7z.0001, name.7z.0002, etc.
+        """
+        # Lower preset = faster compression, use multiprocessing for speed
+        if store_only:
+            filters = [{"id": py7zr.FILTER_COPY}]
+        else:
+            filters = [{"id": py7zr.FILTER_LZMA2, "preset": compression_preset}]
+        
+        volumes = _VolumeWriter(
+            archive_path, mode="wb", volume=max_size, ext_digits=4,
+            on_volume=on_volume
+        )
+        
+        # py7zr issues thousands of small writes (mostly under 4KB); the C
+        # buffer coalesces them so volume splitting runs once per megabyte
+        with io.BufferedWriter(volumes, buffer_size=WRITE_BUFFER_SIZE) as target:
+            with py7zr.SevenZipFile(
+                target,
+                mode='w',
+                filters=filters,
+                mp=use_multiprocessing
+            ) as archive:
+                archive.writeall(directory_path, arcname=os.path.basename(directory_path))
     
     @staticmethod
     def get_directory_size(directory_path: str) -> int:
@@ -92,23 +603,85 @@ class Compressor:
         Returns:
             Total size in bytes
         """
+        return Compressor.get_directory_stats(directory_path)[0]
+    
+    @staticmethod
+    def get_directory_stats(directory_path: str) -> Tuple[int, int]:
+        """
+        Calculate the total size of a directory and how much of it is
+        already-compressed content (see COMPRESSED_EXTENSIONS).
+        
+        Subdirectories are scanned concurrently by a thread pool, since the
+        walk is bound by filesystem latency rather than CPU.
+        
+        Args:
+            directory_path: Path to directory
+            
+        Returns:
+            Tuple of (total_bytes, already_compressed_bytes)
+        """
         total_size = 0
-        for dirpath, dirnames, filenames in os.walk(directory_path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.isfile(filepath):
+        compressed_size = 0
+        with ThreadPoolExecutor(max_workers=SIZE_SCAN_WORKERS) as executor:
+            pending = {executor.submit(Compressor._scan_directory, directory_path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    size, compressed, subdirs = future.result()
+                    total_size += size
+                    compressed_size += compressed
+                    pending.update(
+                        executor.submit(Compressor._scan_directory, subdir)
+                        for subdir in subdirs
+                    )
+        return total_size, compressed_size
+    
+    @staticmethod
+    def _scan_directory(path: str) -> Tuple[int, int, List[str]]:
+        """
+        Sum the sizes of the regular files directly inside a directory.
+        
+        Returns:
+            Tuple of (size_in_bytes, already_compressed_bytes, subdirectory_paths)
+        """
+        total_size = 0
+        compressed_size = 0
+        subdirs = []
+        try:
+            # Scanning through a directory fd makes each stat relative to it
+            # (fstatat), so the kernel does not re-resolve every ancestor
+            # path component for every file
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            return total_size, compressed_size, subdirs  # Skip directories we can't open
+        try:
+            with os.scandir(fd) as entries:
+                for entry in entries:
                     try:
-                        total_size += os.path.getsize(filepath)
-                    except (OSError, PermissionError):
+                        # File type comes from the directory listing itself,
+                        # leaving a single stat per file for its size
+                        if entry.is_file(follow_symlinks=False):
+                            size = entry.stat(follow_symlinks=False).st_size
+                            total_size += size
+                            extension = os.path.splitext(entry.name)[1].lower()
+                            if extension in COMPRESSED_EXTENSIONS:
+                                compressed_size += size
+                        elif entry.is_dir(follow_symlinks=False):
+                            subdirs.append(os.path.join(path, entry.name))
+                    except OSError:
                         pass  # Skip files we can't access
-        return total_size
+        except OSError:
+            pass  # Skip directories we can't list
+        finally:
+            os.close(fd)
+        return total_size, compressed_size, subdirs
     
     @staticmethod
     def format_size(size_bytes: int) -> str:
         """Format bytes to human-readable string."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} PB"
-
+        if size_bytes <= 0:
+            return f"{size_bytes:.2f} B"
+        # Each unit is 2**10 of the previous one, so the unit index is the
+        # bit length divided by 10 (capped at PB)
+        exp = min((int(size_bytes).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (exp * 10)):.2f} {SIZE_UNITS[exp]}"
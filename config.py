@@ -1,10 +1,16 @@
 """Configuration management for Nextcloud Backuper."""
 import os
-from typing import Optional
+from dataclasses import dataclass
+from typing import ClassVar, Optional
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Application configuration loaded from environment variables."""
+    """
+    Application configuration loaded from environment variables.
+    
+    Loaded once into an immutable instance; read it with Config.get().
+    """
     
     # Nextcloud Configuration
     NEXTCLOUD_URL: str
@@ -21,8 +27,16 @@ class Config:
     FORBIDDEN_DIRS_FILE: str
     MAX_VOLUME_SIZE: int  # in bytes
     MAX_UPLOAD_WORKERS: int
+    MAX_PARALLEL_DIRS: int  # Directories backed up concurrently
+    MAX_RETRIES: int  # Retries per upload after a transient failure
+    CHUNKED_UPLOAD_THRESHOLD: int  # Upload larger files in parallel chunks (0 disables)
+    UPLOAD_CHUNK_SIZE: int  # in bytes
+    CHUNK_UPLOAD_WORKERS: int  # Parallel chunk uploads per file
+    ARCHIVE_FORMAT: str  # "7z" or "zst" (tar + zstd)
     COMPRESSION_PRESET: int  # 0-9, lower=faster
     USE_MULTIPROCESSING: bool  # Enable multi-core compression
+    STREAM_UPLOADS: bool  # Upload zst volumes straight from the compressor
+    STORE_COMPRESSED_RATIO: float  # Store without compression above this share of media/archives
     
     # Schedule Configuration
     BACKUP_HOUR: int
@@ -30,32 +44,61 @@ class Config:
     TIMEZONE: str
     RUN_ON_STARTUP: bool
     
+    _instance: ClassVar[Optional["Config"]] = None
+    
     @classmethod
-    def load(cls) -> None:
-        """Load configuration from environment variables."""
-        # Nextcloud (required)
-        cls.NEXTCLOUD_URL = cls._get_required_env("NEXTCLOUD_URL")
-        cls.NEXTCLOUD_USERNAME = cls._get_required_env("NEXTCLOUD_USERNAME")
-        cls.NEXTCLOUD_PASSWORD = cls._get_required_env("NEXTCLOUD_PASSWORD")
-        cls.NEXTCLOUD_BACKUP_PATH = os.getenv("NEXTCLOUD_BACKUP_PATH", "backup/mainserver")
+    def load(cls) -> "Config":
+        """
+        Load and validate configuration from environment variables.
         
-        # Telegram (required)
-        cls.TELEGRAM_TOKEN = cls._get_required_env("TELEGRAM_TOKEN")
-        cls.TELEGRAM_CHANNEL_ID = cls._get_required_env("TELEGRAM_CHANNEL_ID")
+        The result becomes the instance returned by Config.get().
         
-        # Backup settings
-        cls.BACKUP_BASE_DIR = os.getenv("BACKUP_BASE_DIR", ".")
-        cls.FORBIDDEN_DIRS_FILE = os.getenv("FORBIDDEN_DIRS_FILE", "forbidden")
-        cls.MAX_VOLUME_SIZE = int(os.getenv("MAX_VOLUME_SIZE", str(1024 * 1024 * 1024)))  # 1GB default
-        cls.MAX_UPLOAD_WORKERS = int(os.getenv("MAX_UPLOAD_WORKERS", "4"))
-        cls.COMPRESSION_PRESET = int(os.getenv("COMPRESSION_PRESET", "1"))  # 1 = very fast (recommended)
-        cls.USE_MULTIPROCESSING = os.getenv("USE_MULTIPROCESSING", "true").lower() == "true"
-        
-        # Schedule settings
-        cls.BACKUP_HOUR = int(os.getenv("BACKUP_HOUR", "3"))
-        cls.BACKUP_MINUTE = int(os.getenv("BACKUP_MINUTE", "0"))
-        cls.TIMEZONE = os.getenv("TIMEZONE", "America/New_York")  # EDT/EST
-        cls.RUN_ON_STARTUP = os.getenv("RUN_ON_STARTUP", "true").lower() == "true"
+        Raises:
+            ValueError: If a required variable is missing or a value is invalid
+        """
+        config = cls(
+            # Nextcloud (required)
+            NEXTCLOUD_URL=cls._get_required_env("NEXTCLOUD_URL"),
+            NEXTCLOUD_USERNAME=cls._get_required_env("NEXTCLOUD_USERNAME"),
+            NEXTCLOUD_PASSWORD=cls._get_required_env("NEXTCLOUD_PASSWORD"),
+            NEXTCLOUD_BACKUP_PATH=os.getenv("NEXTCLOUD_BACKUP_PATH", "backup/mainserver"),
+            
+            # Telegram (required)
+            TELEGRAM_TOKEN=cls._get_required_env("TELEGRAM_TOKEN"),
+            TELEGRAM_CHANNEL_ID=cls._get_required_env("TELEGRAM_CHANNEL_ID"),
+            
+            # Backup settings
+            BACKUP_BASE_DIR=os.getenv("BACKUP_BASE_DIR", "."),
+            FORBIDDEN_DIRS_FILE=os.getenv("FORBIDDEN_DIRS_FILE", "forbidden"),
+            MAX_VOLUME_SIZE=int(os.getenv("MAX_VOLUME_SIZE", str(1024 * 1024 * 1024))),  # 1GB default
+            MAX_UPLOAD_WORKERS=int(os.getenv("MAX_UPLOAD_WORKERS", "4")),
+            MAX_PARALLEL_DIRS=int(os.getenv("MAX_PARALLEL_DIRS", "1")),
+            MAX_RETRIES=int(os.getenv("MAX_RETRIES", "3")),
+            CHUNKED_UPLOAD_THRESHOLD=int(os.getenv("CHUNKED_UPLOAD_THRESHOLD", str(256 * 1024 * 1024))),  # 256MB default
+            UPLOAD_CHUNK_SIZE=int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024 * 1024))),  # 64MB default
+            CHUNK_UPLOAD_WORKERS=int(os.getenv("CHUNK_UPLOAD_WORKERS", "4")),
+            ARCHIVE_FORMAT=os.getenv("ARCHIVE_FORMAT", "7z").lower(),
+            COMPRESSION_PRESET=int(os.getenv("COMPRESSION_PRESET", "1")),  # 1 = very fast (recommended)
+            USE_MULTIPROCESSING=os.getenv("USE_MULTIPROCESSING", "true").lower() == "true",
+            STREAM_UPLOADS=os.getenv("STREAM_UPLOADS", "false").lower() == "true",
+            STORE_COMPRESSED_RATIO=float(os.getenv("STORE_COMPRESSED_RATIO", "0.8")),  # >1 disables
+            
+            # Schedule settings
+            BACKUP_HOUR=int(os.getenv("BACKUP_HOUR", "3")),
+            BACKUP_MINUTE=int(os.getenv("BACKUP_MINUTE", "0")),
+            TIMEZONE=os.getenv("TIMEZONE", "America/New_York"),  # EDT/EST
+            RUN_ON_STARTUP=os.getenv("RUN_ON_STARTUP", "true").lower() == "true",
+        )
+        config.validate()
+        cls._instance = config
+        return config
+    
+    @classmethod
+    def get(cls) -> "Config":
+        """Return the loaded configuration, loading it on first use."""
+        if cls._instance is None:
+            cls.load()
+        return cls._instance
     
     @staticmethod
     def _get_required_env(key: str) -> str:
@@ -65,24 +108,48 @@ class Config:
             raise ValueError(f"Required environment variable '{key}' is not set")
         return value
     
-    @classmethod
-    def validate(cls) -> None:
+    def validate(self) -> None:
         """Validate configuration values."""
-        if not cls.NEXTCLOUD_URL.startswith(("http://", "https://")):
+        if not self.NEXTCLOUD_URL.startswith(("http://", "https://")):
             raise ValueError("NEXTCLOUD_URL must start with http:// or https://")
         
-        if cls.MAX_VOLUME_SIZE <= 0:
+        if self.MAX_VOLUME_SIZE <= 0:
             raise ValueError("MAX_VOLUME_SIZE must be positive")
         
-        if cls.MAX_UPLOAD_WORKERS <= 0:
+        if self.MAX_UPLOAD_WORKERS <= 0:
             raise ValueError("MAX_UPLOAD_WORKERS must be positive")
         
-        if not (0 <= cls.COMPRESSION_PRESET <= 9):
+        if self.MAX_PARALLEL_DIRS <= 0:
+            raise ValueError("MAX_PARALLEL_DIRS must be positive")
+        
+        if self.MAX_RETRIES < 0:
+            raise ValueError("MAX_RETRIES must not be negative")
+        
+        if self.CHUNKED_UPLOAD_THRESHOLD < 0:
+            raise ValueError("CHUNKED_UPLOAD_THRESHOLD must not be negative")
+        
+        # Nextcloud rejects chunks under 5MB (except the last) on object storage
+        if self.UPLOAD_CHUNK_SIZE < 5 * 1024 * 1024:
+            raise ValueError("UPLOAD_CHUNK_SIZE must be at least 5MB (5242880)")
+        
+        if self.CHUNK_UPLOAD_WORKERS <= 0:
+            raise ValueError("CHUNK_UPLOAD_WORKERS must be positive")
+        
+        if self.ARCHIVE_FORMAT not in ("7z", "zst"):
+            raise ValueError("ARCHIVE_FORMAT must be '7z' or 'zst'")
+        
+        if self.STREAM_UPLOADS and self.ARCHIVE_FORMAT != "zst":
+            raise ValueError("STREAM_UPLOADS requires ARCHIVE_FORMAT=zst")
+        
+        if self.STORE_COMPRESSED_RATIO < 0:
+            raise ValueError("STORE_COMPRESSED_RATIO must not be negative")
+        
+        if not (0 <= self.COMPRESSION_PRESET <= 9):
             raise ValueError("COMPRESSION_PRESET must be between 0 and 9")
         
-        if not (0 <= cls.BACKUP_HOUR <= 23):
+        if not (0 <= self.BACKUP_HOUR <= 23):
             raise ValueError("BACKUP_HOUR must be between 0 and 23")
         
-        if not (0 <= cls.BACKUP_MINUTE <= 59):
+        if not (0 <= self.BACKUP_MINUTE <= 59):
             raise ValueError("BACKUP_MINUTE must be between 0 and 59")
 
@@ -2,19 +2,39 @@
 """Main entry point for Nextcloud Backuper."""
 import datetime
 import sys
-from apscheduler.schedulers.blocking import BlockingScheduler
-import pytz
+import time
+from zoneinfo import ZoneInfo
 from config import Config
 from backup_manager import BackupManager
 from telegram_logger import TelegramLogger
 
 
+def seconds_until(hour: int, minute: int, timezone: ZoneInfo) -> float:
+    """
+    Return the number of seconds until the next hour:minute wall-clock time.
+    
+    Args:
+        hour: Target hour (0-23)
+        minute: Target minute (0-59)
+        timezone: Timezone the wall-clock time is expressed in
+        
+    Returns:
+        Seconds to sleep (DST transitions are accounted for)
+    """
+    now = datetime.datetime.now(timezone)
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    # Compare absolute timestamps: subtracting two datetimes that share a
+    # tzinfo ignores a UTC offset change (DST) between them
+    return target.timestamp() - now.timestamp()
+
+
 def main():
     """Main function to initialize and run the backup scheduler."""
     try:
         # Load and validate configuration
-        Config.load()
-        Config.validate()
+        cfg = Config.load()
         
         # Initialize logger
         logger = TelegramLogger()
@@ -23,42 +43,37 @@ def main():
         # Initialize backup manager
         backup_manager = BackupManager()
         
-        # Setup scheduler
-        timezone = pytz.timezone(Config.TIMEZONE)
-        scheduler = BlockingScheduler(timezone=timezone)
-        
-        # Add scheduled job
-        scheduler.add_job(
-            backup_manager.run_backup,
-            "cron",
-            hour=Config.BACKUP_HOUR,
-            minute=Config.BACKUP_MINUTE,
-            id="daily_backup"
-        )
+        timezone = ZoneInfo(cfg.TIMEZONE)
         
         logger.send(
             f"⏰ Scheduled daily backup at "
-            f"{Config.BACKUP_HOUR:02d}:{Config.BACKUP_MINUTE:02d} {Config.TIMEZONE}"
+            f"{cfg.BACKUP_HOUR:02d}:{cfg.BACKUP_MINUTE:02d} {cfg.TIMEZONE}"
         )
         
         # Run immediately on startup if configured
-        if Config.RUN_ON_STARTUP:
+        if cfg.RUN_ON_STARTUP:
             logger.send("▶️ Running immediate backup on startup...")
             backup_manager.run_backup()
             logger.send("✅ Initial backup completed. Scheduler will now take over.")
         
-        # Start scheduler (blocking)
-        scheduler.start()
+        # Sleep until the next scheduled time, run, repeat
+        while True:
+            time.sleep(
+                seconds_until(cfg.BACKUP_HOUR, cfg.BACKUP_MINUTE, timezone)
+            )
+            backup_manager.run_backup()
         
     except KeyboardInterrupt:
         logger = TelegramLogger()
         logger.send("⏹️ Backuper stopped by user")
+        logger.close()
         sys.exit(0)
     except Exception as e:
         print(f"Fatal error: {e}")
         try:
             logger = TelegramLogger()
             logger.send_error(f"Fatal error: {e}")
+            logger.close()
         except:
             pass
         sys.exit(1)
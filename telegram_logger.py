@@ -1,42 +1,138 @@
 """Telegram logging functionality."""
+import atexit
+import queue
+import threading
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Optional
 from config import Config
 
 
+# Telegram rejects messages longer than this many characters
+MAX_MESSAGE_LENGTH = 4096
+
+
 class TelegramLogger:
     """Send log messages to Telegram channel."""
     
+    # Shared by all instances: one keep-alive connection to the Bot API and
+    # one delivery thread, so messages from every logger keep their order
+    _session: Optional[requests.Session] = None
+    _queue: "queue.Queue[tuple[str, dict]]" = queue.Queue()
+    _worker: Optional[threading.Thread] = None
+    _worker_lock = threading.Lock()
+    # Batches are kept per thread, not per logger, so directories backed up
+    # concurrently each flush their own lines whichever instance they use
+    _local = threading.local()
+    
     def __init__(self):
         """Initialize Telegram logger with config."""
-        self.token = Config.TELEGRAM_TOKEN
-        self.channel_id = Config.TELEGRAM_CHANNEL_ID
+        cfg = Config.get()
+        self.token = cfg.TELEGRAM_TOKEN
+        self.channel_id = cfg.TELEGRAM_CHANNEL_ID
         self.base_url = f"https://api.telegram.org/bot{self.token}"
     
+    @classmethod
+    def _start_worker(cls) -> None:
+        """Start the background delivery thread on first use."""
+        with cls._worker_lock:
+            if cls._worker is not None:
+                return
+            cls._session = requests.Session()
+            cls._session.mount(
+                "https://", HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            )
+            cls._worker = threading.Thread(
+                target=cls._deliver, name="telegram-logger", daemon=True
+            )
+            cls._worker.start()
+            # The worker is a daemon thread, so drain the queue at exit;
+            # otherwise messages sent just before the process ends are lost
+            atexit.register(cls._queue.join)
+    
+    @classmethod
+    def _deliver(cls) -> None:
+        """Post queued messages one by one, in order."""
+        while True:
+            url, payload = cls._queue.get()
+            try:
+                response = cls._session.post(url, json=payload, timeout=10)
+                response.raise_for_status()
+            except Exception as e:
+                print(
+                    f"Failed to send Telegram message: {payload['text']} | Error: {e}"
+                )
+            finally:
+                cls._queue.task_done()
+    
     def send(self, text: str, silent: bool = False) -> bool:
         """
-        Send a message to Telegram channel.
+        Queue a message for the Telegram channel.
+        
+        Delivery happens on a background thread so callers never wait on
+        the network; failures are printed there.
         
         Args:
             text: Message text to send
             silent: If True, send without notification
             
         Returns:
-            True if successful, False otherwise
+            True once the message is queued
         """
-        try:
-            url = f"{self.base_url}/sendMessage"
-            params = {
-                "chat_id": self.channel_id,
-                "text": text,
-                "disable_notification": silent
-            }
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            print(f"Failed to send Telegram message: {text} | Error: {e}")
+        self._start_worker()
+        url = f"{self.base_url}/sendMessage"
+        payload = {
+            "chat_id": self.channel_id,
+            "text": text,
+            "disable_notification": silent
+        }
+        self._queue.put((url, payload))
+        return True
+    
+    def _batch(self) -> List[str]:
+        """Return the calling thread's buffer of batched messages."""
+        if not hasattr(self._local, "batch"):
+            self._local.batch = []
+        return self._local.batch
+    
+    def send_batched(self, text: str) -> None:
+        """
+        Buffer a message until the next flush() instead of sending it now.
+        
+        Buffers are per thread and shared by every logger instance: flush()
+        sends only the calling thread's lines.
+        """
+        self._batch().append(text)
+    
+    def flush(self, silent: bool = False) -> bool:
+        """
+        Send all buffered messages joined into one Telegram message.
+        
+        The batch is split into several messages only if it exceeds
+        Telegram's message length limit.
+        
+        Args:
+            silent: If True, send without notification
+            
+        Returns:
+            True if anything was queued, False if the buffer was empty
+        """
+        lines, self._local.batch = self._batch(), []
+        if not lines:
             return False
+        
+        message = ""
+        for line in lines:
+            if message and len(message) + 1 + len(line) > MAX_MESSAGE_LENGTH:
+                self.send(message, silent=silent)
+                message = ""
+            message = f"{message}\n{line}" if message else line[:MAX_MESSAGE_LENGTH]
+        self.send(message, silent=silent)
+        return True
+    
+    def close(self) -> None:
+        """Block until every queued message has been delivered (or failed)."""
+        self._queue.join()
     
     def send_error(self, text: str) -> bool:
         """Send error message with emoji."""
@@ -53,4 +149,3 @@ class TelegramLogger:
     def send_progress(self, text: str) -> bool:
         """Send progress message with emoji."""
         return self.send(f"⏳ {text}", silent=True)
-
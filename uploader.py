@@ -1,95 +1,679 @@
 """Nextcloud upload functionality."""
+import mmap
 import os
-from typing import List
+import random
+import threading
+import time
+import uuid
+from urllib.parse import quote
+from typing import BinaryIO, Callable, Iterable, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import nextcloud_client
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
 from telegram_logger import TelegramLogger
 
 
+# Bytes read from a volume and handed to the socket per send call
+SEND_BLOCK_SIZE = 1024 * 1024
+
+# (connect, read) timeout in seconds for every Nextcloud request. The read
+# timeout bounds each wait for the server, e.g. for the response after a
+# body is sent or while a chunked upload is assembled, so a stalled
+# request fails (and is retried) instead of holding its worker forever
+REQUEST_TIMEOUT = (30, 300)
+
+# Upload errors listed individually in a batch's failure summary
+MAX_LISTED_ERRORS = 20
+
+# WebDAV statuses meaning the request took effect
+DAV_OK_STATUS_CODES = frozenset({200, 201, 204})
+
+# Server responses worth retrying: rate limiting and transient gateway errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _file_size(path: str) -> int:
+    """Return a file's size, or 0 if it is missing (its upload reports that)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _is_transient(error: Exception) -> bool:
+    """Return True for upload errors that a later attempt may not hit."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return (
+        isinstance(error, nextcloud_client.HTTPResponseError)
+        and error.status_code in RETRY_STATUS_CODES
+    )
+
+
+class _MappedSlice:
+    """
+    Read-only file-like view of a byte range of an mmap, used as a request
+    body. Only the block being sent is copied out of the page cache.
+    """
+    
+    def __init__(self, mapping: mmap.mmap, start: int, end: int):
+        self._mapping = mapping
+        self._position = start
+        self._end = end
+    
+    def __len__(self) -> int:
+        # requests takes Content-Length from this
+        return self._end - self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._end - self._position:
+            size = self._end - self._position
+        start = self._position
+        self._position += size
+        return self._mapping[start:self._position]
+
+
+class _UploadAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections send request bodies in large blocks and
+    time out after REQUEST_TIMEOUT unless a request sets its own timeout.
+    """
+    
+    def init_poolmanager(self, *args, **kwargs):
+        # urllib3 reads file bodies 16KB at a time by default; larger reads
+        # cut the read/encrypt/send round-trips through Python per volume
+        kwargs.setdefault("blocksize", SEND_BLOCK_SIZE)
+        super().init_poolmanager(*args, **kwargs)
+    
+    def send(self, request, timeout=None, **kwargs):
+        # pyncclient never passes a timeout, and requests' default is none
+        if timeout is None:
+            timeout = REQUEST_TIMEOUT
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+class _AdaptiveLimit:
+    """
+    Concurrency limit that probes upward while upload throughput holds.
+    
+    Throughput is measured over windows of as many completed uploads as
+    the current limit, counting only time with uploads in flight (time
+    spent waiting on the compressor says nothing about the uplink). Each
+    window grows the limit by one unless it fell more than 10% behind the
+    previous one; a drop or a failed upload shrinks it by one and makes
+    the next window a fresh baseline, so the limit keeps probing around
+    the point where the uplink saturates instead of ratcheting down.
+    """
+    
+    def __init__(self, maximum: int, initial: int = 2):
+        self.maximum = maximum
+        self.limit = min(initial, maximum)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._last_rate: Optional[float] = None
+        self._busy_since = 0.0
+        self._reset_window()
+    
+    def _reset_window(self) -> None:
+        self._window_bytes = 0
+        self._window_count = 0
+        self._window_busy = 0.0
+    
+    def _shrink(self) -> None:
+        self.limit = max(1, self.limit - 1)
+        self._last_rate = None  # Re-baseline at the new limit
+    
+    def acquire(self) -> None:
+        """Block until fewer than `limit` uploads are in flight."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            if self._in_flight == 0:
+                self._busy_since = time.monotonic()
+            self._in_flight += 1
+    
+    def release(self, size: int, ok: bool) -> None:
+        """Record a finished upload of `size` bytes and adjust the limit."""
+        with self._condition:
+            now = time.monotonic()
+            self._window_busy += now - self._busy_since
+            self._busy_since = now
+            self._in_flight -= 1
+            if not ok:
+                self._shrink()
+                self._reset_window()
+            else:
+                self._window_bytes += size
+                self._window_count += 1
+                if self._window_count >= self.limit:
+                    rate = self._window_bytes / max(self._window_busy, 1e-6)
+                    if self._last_rate is not None and rate < self._last_rate * 0.9:
+                        self._shrink()
+                    else:
+                        if self._last_rate is not None:
+                            self.limit = min(self.maximum, self.limit + 1)
+                        self._last_rate = rate
+                    self._reset_window()
+            self._condition.notify_all()
+
+
 class NextcloudUploader:
     """Handle file uploads to Nextcloud."""
     
+    _singleton: Optional["NextcloudUploader"] = None
+    _singleton_lock = threading.Lock()
+    
+    @classmethod
+    def instance(cls, logger: TelegramLogger) -> "NextcloudUploader":
+        """
+        Return the process-wide uploader, creating it on first use.
+        
+        Sharing one uploader keeps one logged-in client and one warm
+        connection pool for the daemon's lifetime. The logger passed on the
+        first call is the one used.
+        """
+        with cls._singleton_lock:
+            if cls._singleton is None:
+                cls._singleton = cls(logger)
+            return cls._singleton
+    
     def __init__(self, logger: TelegramLogger):
         """Initialize uploader with Nextcloud credentials."""
-        self.base_url = Config.NEXTCLOUD_URL
-        self.username = Config.NEXTCLOUD_USERNAME
-        self.password = Config.NEXTCLOUD_PASSWORD
+        cfg = Config.get()
+        self.base_url = cfg.NEXTCLOUD_URL
+        self.username = cfg.NEXTCLOUD_USERNAME
+        self.password = cfg.NEXTCLOUD_PASSWORD
         self.logger = logger
+        self._client: Optional[nextcloud_client.Client] = None
+        self._client_lock = threading.Lock()
+        self._remote_dirs: set = set()
+        # One limit for every batch and concurrent directory, since they all
+        # share the uplink; what it learns carries over between batches.
+        # It starts where a single directory's thread pool tops out.
+        self._upload_limit = _AdaptiveLimit(
+            cfg.MAX_UPLOAD_WORKERS * cfg.MAX_PARALLEL_DIRS,
+            initial=cfg.MAX_UPLOAD_WORKERS
+        )
+    
+    def _get_client(self) -> nextcloud_client.Client:
+        """
+        Return the shared logged-in Nextcloud client, logging in on first use.
+        
+        All upload threads share this client and therefore one connection
+        pool, so kept-alive TLS connections are reused across files instead
+        of paying a new handshake and login round-trip per file.
+        """
+        cfg = Config.get()
+        with self._client_lock:
+            if self._client is None:
+                nc = nextcloud_client.Client(self.base_url)
+                nc.login(self.username, self.password)
+                # Keep one pooled connection per chunk upload thread of every
+                # upload worker in every concurrent directory; the default
+                # pool of 10 would drop and re-handshake connections beyond
+                # that. Blocking makes any extra thread wait for a pooled
+                # connection rather than open a throwaway one. Failed
+                # connects are retried here, before any body is sent;
+                # anything later is retried by _put_file.
+                adapter = _UploadAdapter(
+                    pool_connections=1,
+                    pool_maxsize=(
+                        cfg.MAX_UPLOAD_WORKERS
+                        * cfg.MAX_PARALLEL_DIRS
+                        * cfg.CHUNK_UPLOAD_WORKERS
+                    ),
+                    pool_block=True,
+                    max_retries=Retry(
+                        total=None, connect=3, read=0, status=0, other=0,
+                        redirect=False, backoff_factor=0.5
+                    )
+                )
+                nc._session.mount("https://", adapter)
+                nc._session.mount("http://", adapter)
+                self._client = nc
+            return self._client
+    
+    def _ensure_remote_dir(self, remote_directory: str) -> None:
+        """
+        Create a remote directory and its missing parents, once per path.
+        
+        Every level is created with its own MKCOL (Nextcloud does not create
+        parents), and paths already handled are remembered so later batches
+        in the same backup run cost no round-trips (see forget_remote_dirs).
+        Errors are not raised: if the directory is really missing, the
+        uploads report it.
+        """
+        path = ""
+        for part in remote_directory.strip("/").split("/"):
+            path = f"{path}/{part}" if path else part
+            if path in self._remote_dirs:
+                continue
+            try:
+                self._get_client().mkdir(path)
+            except nextcloud_client.HTTPResponseError as e:
+                if e.status_code != 405:
+                    return  # Not "already exists"; retry on the next batch
+            except Exception:
+                return  # Connection or login problem; retry on the next batch
+            self._remote_dirs.add(path)
+    
+    def forget_remote_dirs(self) -> None:
+        """
+        Drop the cache of created remote directories.
+        
+        Called at the start of every backup run, since directories may be
+        removed on the server between runs.
+        """
+        self._remote_dirs.clear()
+    
+    def delete_archive(self, remote_directory: str, archive_name: str) -> int:
+        """
+        Delete the uploaded volumes of an archive (archive_name.0001, ...).
+        
+        Used when an archive could not be finished: its volumes cannot be
+        restored without the rest and would look like a complete backup.
+        Errors are reported to Telegram, not raised.
+        
+        Args:
+            remote_directory: Remote directory holding the volumes
+            archive_name: Volume name prefix (e.g. name.7z)
+        
+        Returns:
+            Number of volumes deleted
+        """
+        try:
+            entries = self._get_client().list(remote_directory) or []
+        except Exception as e:
+            self.logger.send_error(
+                f"Failed to list {remote_directory} to remove {archive_name}: {e}"
+            )
+            return 0
+        
+        deleted = 0
+        for entry in entries:
+            stem, _, index = entry.get_name().rpartition(".")
+            if stem != archive_name or not index.isdigit():
+                continue
+            remote_path = os.path.join(remote_directory, entry.get_name())
+            try:
+                self._get_client().delete(remote_path)
+                deleted += 1
+            except Exception as e:
+                self.logger.send_error(f"Failed to remove {remote_path}: {e}")
+        return deleted
     
     def upload_file(self, local_file: str, remote_directory: str) -> None:
         """
         Upload a single file to Nextcloud.
         
+        The file is streamed as the body of a single PUT, so memory use does
+        not grow with the file size. Connection errors, timeouts and
+        429/5xx responses are retried up to MAX_RETRIES times with
+        exponential backoff; other errors fail immediately.
+        
         Args:
             local_file: Path to local file
-            remote_directory: Remote directory path in Nextcloud
+            remote_directory: Existing remote directory path in Nextcloud
             
         Raises:
             Exception: If upload fails
         """
-        nc = nextcloud_client.Client(self.base_url)
-        nc.login(self.username, self.password)
+        remote_path = os.path.join(remote_directory, os.path.basename(local_file))
+        self._put_file(local_file, remote_path)
+    
+    def _dav_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a WebDAV request on the shared session.
+        
+        Raises:
+            nextcloud_client.HTTPResponseError: If the server does not
+                confirm the request took effect
+        """
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        response = self._get_client()._session.request(method, url, **kwargs)
+        if response.status_code not in DAV_OK_STATUS_CODES:
+            raise nextcloud_client.HTTPResponseError(response)
+        return response
+    
+    def _put(self, remote_path: str, body) -> None:
+        """
+        PUT a request body straight to the WebDAV endpoint, without
+        pyncclient's per-call path handling and response parsing.
+        """
+        url = self._get_client()._webdav_url + quote("/" + remote_path.lstrip("/"))
+        self._dav_request("PUT", url, data=body)
+    
+    def _put_chunked(self, local_file: str, remote_path: str, size: int) -> None:
+        """
+        Upload a large file in parallel chunks with Nextcloud's chunked
+        upload API.
+        
+        Chunks of UPLOAD_CHUNK_SIZE are PUT into a temporary upload
+        collection by CHUNK_UPLOAD_WORKERS threads, each on its own
+        connection, then assembled on the server with one MOVE. Several
+        streams reach bandwidth a single TCP stream cannot on long or
+        congested routes.
+        
+        Raises:
+            nextcloud_client.HTTPResponseError: If any step is rejected
+        """
+        cfg = Config.get()
+        nc = self._get_client()
+        user = quote(self.username)
+        upload_url = f"{nc.url}remote.php/dav/uploads/{user}/{uuid.uuid4().hex}"
+        headers = {
+            "Destination": (
+                f"{nc.url}remote.php/dav/files/{user}"
+                + quote("/" + remote_path.lstrip("/"))
+            ),
+            "OC-Total-Length": str(size),
+        }
+        
+        def put_chunk(mapping: mmap.mmap, index: int) -> None:
+            start = index * cfg.UPLOAD_CHUNK_SIZE
+            body = _MappedSlice(mapping, start, min(start + cfg.UPLOAD_CHUNK_SIZE, size))
+            # Zero-padded so the server assembles chunks in order
+            self._dav_request(
+                "PUT", f"{upload_url}/{index + 1:05d}", data=body, headers=headers
+            )
+        
+        self._dav_request("MKCOL", upload_url, headers=headers)
+        try:
+            chunk_count = -(-size // cfg.UPLOAD_CHUNK_SIZE)
+            # Chunk threads read through one shared mapping of the file, so
+            # memory use stays at one send block per thread at any chunk size
+            with open(local_file, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                with ThreadPoolExecutor(max_workers=cfg.CHUNK_UPLOAD_WORKERS) as executor:
+                    list(executor.map(
+                        lambda index: put_chunk(mapping, index), range(chunk_count)
+                    ))
+            self._dav_request("MOVE", f"{upload_url}/.file", headers=headers)
+        except Exception:
+            try:
+                # Drop the uploaded chunks
+                nc._session.delete(upload_url, timeout=REQUEST_TIMEOUT)
+            except Exception:
+                pass
+            raise
+    
+    def _put_file(self, local_file: str, remote_path: str) -> None:
+        """Upload a local file to a precomputed remote path (see upload_file)."""
+        cfg = Config.get()
+        max_retries = cfg.MAX_RETRIES
+        size = _file_size(local_file)
+        chunked = 0 < cfg.CHUNKED_UPLOAD_THRESHOLD < size
+        
+        for attempt in range(max_retries + 1):
+            try:
+                if chunked:
+                    self._put_chunked(local_file, remote_path, size)
+                    return
+                with open(local_file, "rb") as f:
+                    if hasattr(os, "posix_fadvise"):
+                        # Widen kernel readahead so disk reads overlap with sending
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    self._put(remote_path, f)
+                return
+            except Exception as e:
+                if attempt == max_retries or not _is_transient(e):
+                    raise
+            time.sleep(min(2 ** attempt, 30) + random.random())
+            # A PUT that timed out or lost its response may still have
+            # completed; one PROPFIND is cheaper than re-sending the body
+            if self._remote_matches(remote_path, size):
+                return
+    
+    def _put_reported(
+        self,
+        local_file: str,
+        remote_path: str,
+        filename: str
+    ) -> Tuple[str, Optional[Exception]]:
+        """Run _put_file, returning (filename, error) instead of raising."""
+        try:
+            self._put_file(local_file, remote_path)
+            return filename, None
+        except Exception as e:
+            return filename, e
+    
+    def _remote_matches(self, remote_path: str, size: int) -> bool:
+        """Return True if the remote file exists with the given size."""
+        try:
+            info = self._get_client().file_info(remote_path)
+        except Exception:
+            return False
+        return info is not None and info.get_size() == size
+    
+    def _retry_transient(self, send: Callable[[], object]) -> None:
+        """
+        Call send, retrying transient errors up to MAX_RETRIES times with
+        the same backoff as _put_file. send must be safe to repeat.
+        """
+        max_retries = Config.get().MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            try:
+                send()
+                return
+            except Exception as e:
+                if attempt == max_retries or not _is_transient(e):
+                    raise
+            time.sleep(min(2 ** attempt, 30) + random.random())
+    
+    def _put_stream_volume(
+        self,
+        stream: BinaryIO,
+        remote_path: str,
+        volume_size: int
+    ) -> int:
+        """
+        Upload the next volume_size bytes of a stream with Nextcloud's
+        chunked upload API.
+        
+        Each chunk of UPLOAD_CHUNK_SIZE is read into memory and PUT with a
+        Content-Length, so the server rejects a truncated body and a failed
+        chunk can be re-sent. The MOVE that assembles the volume carries
+        its total length (OC-Total-Length), which Nextcloud checks against
+        the assembled file.
+        
+        Returns:
+            Bytes uploaded, or 0 if the stream was already exhausted
+            
+        Raises:
+            Exception: If a chunk or the assembly fails
+        """
+        cfg = Config.get()
+        chunk = stream.read(min(cfg.UPLOAD_CHUNK_SIZE, volume_size))
+        if not chunk:
+            return 0
+        
+        nc = self._get_client()
+        user = quote(self.username)
+        upload_url = f"{nc.url}remote.php/dav/uploads/{user}/{uuid.uuid4().hex}"
+        headers = {
+            "Destination": (
+                f"{nc.url}remote.php/dav/files/{user}"
+                + quote("/" + remote_path.lstrip("/"))
+            ),
+        }
         
-        # Ensure remote directory exists
+        self._dav_request("MKCOL", upload_url, headers=headers)
+        sent = 0
         try:
-            nc.mkdir(remote_directory)
+            index = 0
+            while chunk:
+                index += 1
+                # Zero-padded so the server assembles chunks in order
+                url = f"{upload_url}/{index:05d}"
+                self._retry_transient(lambda: self._dav_request(
+                    "PUT", url, data=chunk, headers=headers
+                ))
+                sent += len(chunk)
+                if sent >= volume_size:
+                    break
+                chunk = stream.read(
+                    min(cfg.UPLOAD_CHUNK_SIZE, volume_size - sent)
+                )
+            
+            headers["OC-Total-Length"] = str(sent)
+            try:
+                self._dav_request("MOVE", f"{upload_url}/.file", headers=headers)
+            except Exception:
+                # The assembly may have finished with only its response lost
+                if not self._remote_matches(remote_path, sent):
+                    raise
         except Exception:
-            pass  # Directory probably exists
+            try:
+                # Drop the uploaded chunks
+                nc._session.delete(upload_url, timeout=REQUEST_TIMEOUT)
+            except Exception:
+                pass
+            raise
+        return sent
+    
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        remote_directory: str,
+        archive_name: str,
+        volume_size: int
+    ) -> List[int]:
+        """
+        Upload a stream as numbered volumes without writing it to disk.
+        
+        The stream is cut into volumes of volume_size bytes, named like
+        archive_name.0001, archive_name.0002, etc. Each volume is sent with
+        the chunked upload API (see _put_stream_volume), holding one
+        UPLOAD_CHUNK_SIZE chunk in memory at a time. Volumes go out one
+        after another since the stream can only be read in order.
         
-        filename = os.path.basename(local_file)
-        remote_path = os.path.join(remote_directory, filename)
-        nc.put_file(remote_path, local_file)
+        Args:
+            stream: Readable binary stream (e.g. a compressor pipe)
+            remote_directory: Remote directory path in Nextcloud
+            archive_name: Volume name prefix
+            volume_size: Maximum volume size in bytes
+            
+        Returns:
+            List of uploaded volume sizes in bytes
+            
+        Raises:
+            Exception: If a volume fails (chunks are retried, but the
+                       stream itself cannot be replayed)
+        """
+        self._ensure_remote_dir(remote_directory)
+        
+        self.logger.send_batched(
+            f"⬆️ Streaming {archive_name} to Nextcloud..."
+        )
+        
+        sizes = []
+        while True:
+            filename = f"{archive_name}.{len(sizes) + 1:04d}"
+            size = self._put_stream_volume(
+                stream, os.path.join(remote_directory, filename), volume_size
+            )
+            if not size:
+                break
+            sizes.append(size)
+            self.logger.send_batched(f"✅ Uploaded {filename}")
+        
+        return sizes
     
     def upload_files_parallel(
         self,
-        files: List[str],
+        files: Iterable[str],
         remote_directory: str,
-        dir_name: str = ""
+        dir_name: str = "",
+        delete_after: bool = False
     ) -> tuple[int, int]:
         """
         Upload multiple files in parallel using thread pool.
         
+        Files are submitted as the iterable yields them, so it may be a
+        generator fed by a running compression (uploads start before the
+        last file exists). Uploads of all concurrent batches share one
+        concurrency limit that adapts to measured throughput, up to
+        MAX_UPLOAD_WORKERS per batch.
+        
         Args:
-            files: List of local file paths
+            files: Iterable of local file paths
             remote_directory: Remote directory path in Nextcloud
             dir_name: Directory name for logging
+            delete_after: Remove each local file as soon as its upload
+                          finishes (successfully or not) to free disk space
             
         Returns:
             Tuple of (successful_uploads, failed_uploads)
         """
+        cfg = Config.get()
         successful = 0
         failed = 0
-        total = len(files)
         
-        self.logger.send_progress(
-            f"⬆️ Uploading {total} part(s) for {dir_name} in parallel..."
+        self.logger.send_batched(
+            f"⬆️ Uploading parts for {dir_name} in parallel..."
         )
+        self._ensure_remote_dir(remote_directory)
         
-        with ThreadPoolExecutor(max_workers=Config.MAX_UPLOAD_WORKERS) as executor:
-            # Submit all upload tasks
-            future_to_file = {
-                executor.submit(self.upload_file, file, remote_directory): file
-                for file in files
-            }
+        limit = self._upload_limit
+        with ThreadPoolExecutor(max_workers=cfg.MAX_UPLOAD_WORKERS) as executor:
+            # Submit upload tasks as files become available; each task
+            # reports its own file name, so no future-to-file map is needed
+            futures = []
+            for file in files:
+                size = _file_size(file)
+                filename = os.path.basename(file)
+                limit.acquire()
+                future = executor.submit(
+                    self._put_reported,
+                    file, os.path.join(remote_directory, filename), filename
+                )
+                if delete_after:
+                    future.add_done_callback(
+                        lambda _, path=file: self._remove_local(path)
+                    )
+                future.add_done_callback(
+                    lambda done, size=size: limit.release(
+                        size, done.result()[1] is None
+                    )
+                )
+                futures.append(future)
+            total = len(futures)
             
-            # Process completed uploads
-            for idx, future in enumerate(as_completed(future_to_file), start=1):
-                file_path = future_to_file[future]
-                filename = os.path.basename(file_path)
-                
-                try:
-                    future.result()
+            # Process completed uploads, logging progress about every 5%
+            # and collecting errors into a single message
+            report_every = max(1, total // 20)
+            errors = []
+            for idx, future in enumerate(as_completed(futures), start=1):
+                filename, error = future.result()
+                if error is None:
                     successful += 1
-                    self.logger.send(
-                        f"✅ Uploaded {idx}/{total}: {filename}",
-                        silent=True
-                    )
-                except Exception as e:
+                else:
                     failed += 1
-                    self.logger.send_error(
-                        f"Failed to upload {filename}: {str(e)}"
+                    errors.append(f"{filename}: {str(error)}")
+                
+                if idx % report_every == 0 or idx == total:
+                    failures = f" ({failed} failed)" if failed else ""
+                    self.logger.send_batched(
+                        f"✅ Uploaded {successful}/{total}{failures}"
                     )
         
+        if errors:
+            shown = errors[:MAX_LISTED_ERRORS]
+            if len(errors) > len(shown):
+                shown.append(f"...and {len(errors) - len(shown)} more")
+            self.logger.send_batched(
+                f"❌ Failed to upload {failed} part(s) for {dir_name}:\n"
+                + "\n".join(shown)
+            )
+        
         return successful, failed
-
+    
+    def _remove_local(self, local_file: str) -> None:
+        """Delete an uploaded local file, reporting but not raising errors."""
+        try:
+            os.remove(local_file)
+        except OSError as e:
+            self.logger.send_error(f"Failed to remove {local_file}: {e}")